@@ -7,6 +7,10 @@ class Settings(BaseSettings):
     KAFKA_TOPIC: str = "payments"
     KAFKA_GROUP_ID: str = "payment-scoring-group"
 
+    # Micro-batch poll: up to N messages or until the timeout
+    CONSUMER_BATCH_SIZE: int = 500
+    CONSUMER_BATCH_TIMEOUT_SECONDS: float = 0.05
+
     MYSQL_HOST: str = "mysql"
     MYSQL_PORT: int = 3306
     MYSQL_USER: str = "root"
@@ -15,6 +19,35 @@ class Settings(BaseSettings):
 
     MODEL_PATH: str = "model_artifacts/fraud_model.pkl"
     SCALER_PATH: str = "model_artifacts/scaler.pkl"
+    PRESCREEN_MODEL_PATH: str = "model_artifacts/prescreen_model.pkl"
+
+    # Per worker process; 0 = one thread per core available to the process
+    INFERENCE_THREADS: int = 1
+    INFERENCE_MIN_CHUNK_ROWS: int = 256
+    NATIVE_THREADS: int = 1
+
+    STATS_LOG_INTERVAL_SECONDS: float = 60.0
+
+    SCORE_CACHE_ENABLED: bool = False
+    SCORE_CACHE_SIZE: int = 50000
+    SCORE_CACHE_DECIMALS: int = 6
+
+    CASCADE_ENABLED: bool = False
+    CASCADE_APPROVE_THRESHOLD: float = 0.2
+    CASCADE_AGREEMENT_SAMPLE_RATE: float = 0.01
+
+    RULES_PATH: str = "app/config/rules.json"
+    RULES_RELOAD_INTERVAL_SECONDS: float = 5.0
+
+    VELOCITY_WINDOW_SECONDS: int = 60
+    VELOCITY_ALLOWED_LATENESS_SECONDS: float = 5.0
+
+    PARTITION_STATE_ENABLED: bool = True
+
+    DEDUP_ENABLED: bool = True
+    DEDUP_BLOOM_CAPACITY: int = 100000
+    DEDUP_BLOOM_FP_RATE: float = 0.001
+    DEDUP_LRU_SIZE: int = 10000
 
     class Config:
         env_file = ".env"
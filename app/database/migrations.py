@@ -0,0 +1,48 @@
+import logging
+from sqlalchemy import inspect, text
+from app.database.models import ScoredTransaction
+
+logger = logging.getLogger("migrations")
+
+
+def upgrade_schema(engine):
+    """
+    Bring an existing scored_transactions table up to the model.
+    `create_all` only creates missing tables, so columns and indexes
+    added since the table was created are added here. Idempotent, safe
+    to run on every startup.
+
+    Rows written before `event_time` existed are backfilled with their
+    `processed_at`, so velocity counts and the dashboard's event-time
+    panels keep seeing them. Their latency columns stay NULL and are
+    left out of the latency panel.
+    """
+    table = ScoredTransaction.__table__
+    inspector = inspect(engine)
+    if not inspector.has_table(table.name):
+        return
+
+    existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+    existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+
+    added = []
+    with engine.begin() as conn:
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type} NULL"))
+            added.append(column.name)
+
+        if "event_time" in added:
+            conn.execute(text(
+                f"UPDATE {table.name} SET event_time = processed_at WHERE event_time IS NULL"
+            ))
+
+    for index in table.indexes:
+        if index.name not in existing_indexes:
+            index.create(bind=engine)
+            added.append(index.name)
+
+    if added:
+        logger.info(f"Upgraded {table.name}: added {added}")
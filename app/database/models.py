@@ -21,8 +21,12 @@ class ScoredTransaction(Base):
         UniqueConstraint("transaction_id", name="uq_transaction_id"),
 
         # Optimized for velocity rule:
-        # WHERE customer_id = ? AND created_at >= ?
-        Index("idx_customer_created", "customer_id", "created_at"),
+        # WHERE customer_id = ? AND event_time BETWEEN ? AND ?
+        Index("idx_customer_event", "customer_id", "event_time"),
+
+        # Rebuilding per-partition velocity state on assignment:
+        # WHERE kafka_partition IN (...) AND event_time >= ?
+        Index("idx_partition_event", "kafka_partition", "event_time"),
 
         # Used heavily in dashboard aggregations
         Index("idx_status", "status"),
@@ -38,6 +42,9 @@ class ScoredTransaction(Base):
 
     amount = Column(Float)
 
+    # Partition the transaction was consumed from (keyed by customer_id)
+    kafka_partition = Column(Integer, nullable=True)
+
     score = Column(Float, nullable=False)
     prediction = Column(Integer, nullable=False)
     status = Column(String(20), nullable=False)
@@ -45,8 +52,15 @@ class ScoredTransaction(Base):
     # Explainability field
     reason = Column(String(100), nullable=True)
 
-    # When transaction was inserted (event time)
+    # When the payment happened (producer event_time or Kafka timestamp)
+    event_time = Column(DateTime, nullable=True)
+
+    # When transaction was inserted (buffered flush time)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # When model finished processing (for latency tracking)
     processed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Event time -> consumer read, and event time -> scored
+    consume_lag_ms = Column(Float, nullable=True)
+    latency_ms = Column(Float, nullable=True)
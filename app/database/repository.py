@@ -22,6 +22,25 @@ class TransactionRepository:
         if len(cls._buffer) >= BATCH_SIZE:
             cls.flush()
 
+    @classmethod
+    def save_many(cls, transactions: list):
+        """
+        Add a batch of transactions to the buffer in one step.
+        If the automatic flush fails the rows stay buffered and go out
+        with the next flush.
+        """
+        cls._buffer.extend(transactions)
+
+        if len(cls._buffer) >= BATCH_SIZE:
+            cls.flush()
+
+    @classmethod
+    def buffered_ids(cls) -> set:
+        """
+        Transaction IDs buffered but not flushed yet.
+        """
+        return {row["transaction_id"] for row in cls._buffer}
+
     @classmethod
     def flush(cls):
         """
@@ -30,6 +49,7 @@ class TransactionRepository:
         if not cls._buffer:
             return
 
+        dropped = 0
         session = SessionLocal()
         try:
             session.bulk_insert_mappings(
@@ -39,27 +59,132 @@ class TransactionRepository:
             session.commit()
             cls._buffer.clear()
         except IntegrityError:
-            # Ignore duplicates safely
+            # Drop duplicates so one of them cannot block every later insert
             session.rollback()
+            dropped = cls._drop_duplicates(session)
+        finally:
+            session.close()
+
+        if dropped:
+            cls.flush()
+
+    @classmethod
+    def _drop_duplicates(cls, session) -> int:
+        """
+        Remove buffered rows that are already stored or repeated in the
+        buffer. Returns the number of rows removed.
+        """
+        ids = [row["transaction_id"] for row in cls._buffer]
+        stored = {
+            row[0] for row in
+            session.query(ScoredTransaction.transaction_id)
+            .filter(ScoredTransaction.transaction_id.in_(ids))
+        }
+
+        unique = {}
+        for row in cls._buffer:
+            if row["transaction_id"] not in stored:
+                unique.setdefault(row["transaction_id"], row)
+
+        dropped = len(cls._buffer) - len(unique)
+        cls._buffer[:] = list(unique.values())
+        return dropped
+
+    @classmethod
+    def exists(cls, transaction_id: str) -> bool:
+        """
+        Exact duplicate check against the buffer and MySQL.
+        """
+        if any(row["transaction_id"] == transaction_id for row in cls._buffer):
+            return True
+
+        session = SessionLocal()
+        try:
+            return session.query(
+                session.query(ScoredTransaction.id)
+                .filter(ScoredTransaction.transaction_id == transaction_id)
+                .exists()
+            ).scalar()
+        finally:
+            session.close()
+
+    @staticmethod
+    def recent_transaction_ids(limit: int):
+        """
+        Most recently inserted transaction IDs, oldest first.
+        """
+        session = SessionLocal()
+        try:
+            rows = (
+                session.query(ScoredTransaction.transaction_id)
+                .order_by(ScoredTransaction.id.desc())
+                .limit(limit)
+                .all()
+            )
+            return [row[0] for row in reversed(rows)]
+        finally:
+            session.close()
+
+    @staticmethod
+    def latest_partition_event_times(partitions: list) -> dict:
+        """
+        Newest stored event time per partition.
+        """
+        session = SessionLocal()
+        try:
+            rows = (
+                session.query(
+                    ScoredTransaction.kafka_partition,
+                    func.max(ScoredTransaction.event_time)
+                )
+                .filter(ScoredTransaction.kafka_partition.in_(partitions))
+                .group_by(ScoredTransaction.kafka_partition)
+                .all()
+            )
+            return dict(rows)
+        finally:
+            session.close()
+
+    @staticmethod
+    def recent_partition_events(partition: int, since: datetime):
+        """
+        (customer_id, event_time) rows of one partition since a point
+        in event time, oldest first.
+        """
+        session = SessionLocal()
+        try:
+            return (
+                session.query(
+                    ScoredTransaction.customer_id,
+                    ScoredTransaction.event_time
+                )
+                .filter(ScoredTransaction.kafka_partition == partition)
+                .filter(ScoredTransaction.event_time >= since)
+                .order_by(ScoredTransaction.event_time)
+                .all()
+            )
         finally:
             session.close()
 
     @staticmethod
-    def count_recent_transactions(customer_id: str, seconds: int = 60):
+    def count_recent_transactions(customer_id: str, seconds: int = 60, until: datetime = None):
         """
-        Count transactions for a customer in the last X seconds.
+        Count transactions for a customer in the X seconds of event time
+        ending at `until` (defaults to now).
         Optimized query using COUNT(*) with proper filtering.
         """
 
         session = SessionLocal()
         try:
-            time_threshold = datetime.utcnow() - timedelta(seconds=seconds)
+            until = until or datetime.utcnow()
+            time_threshold = until - timedelta(seconds=seconds)
 
             count = (
                 session.query(func.count())
                 .select_from(ScoredTransaction)
                 .filter(ScoredTransaction.customer_id == customer_id)
-                .filter(ScoredTransaction.created_at >= time_threshold)
+                .filter(ScoredTransaction.event_time >= time_threshold)
+                .filter(ScoredTransaction.event_time <= until)
                 .scalar()
             )
 
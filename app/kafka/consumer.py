@@ -1,10 +1,19 @@
 import json
-from confluent_kafka import Consumer, Producer
+import logging
+import time
+from confluent_kafka import Consumer, Producer, TIMESTAMP_NOT_AVAILABLE
 from app.config.settings import settings
 
+logger = logging.getLogger("kafka-consumer")
+
+
 class KafkaConsumerClient:
 
-    def __init__(self):
+    def __init__(self, on_assign=None, on_revoke=None):
+        """
+        `on_assign` / `on_revoke` receive the list of partition numbers
+        whenever the group rebalances.
+        """
         self.consumer = Consumer({
             "bootstrap.servers": settings.KAFKA_BOOTSTRAP_SERVERS,
             "group.id": settings.KAFKA_GROUP_ID,
@@ -15,9 +24,25 @@ class KafkaConsumerClient:
             "bootstrap.servers": settings.KAFKA_BOOTSTRAP_SERVERS
         })
 
-        self.consumer.subscribe([settings.KAFKA_TOPIC])
+        self._on_assign = on_assign
+        self._on_revoke = on_revoke
+
+        self.consumer.subscribe(
+            [settings.KAFKA_TOPIC],
+            on_assign=self._handle_assign,
+            on_revoke=self._handle_revoke,
+            on_lost=self._handle_revoke
+        )
         self.dlq_topic = f"{settings.KAFKA_TOPIC}_dlq"
 
+    def _handle_assign(self, consumer, partitions):
+        if self._on_assign:
+            self._on_assign([p.partition for p in partitions])
+
+    def _handle_revoke(self, consumer, partitions):
+        if self._on_revoke:
+            self._on_revoke([p.partition for p in partitions])
+
     def poll(self):
         msg = self.consumer.poll(1.0)
         if msg is None:
@@ -25,11 +50,55 @@ class KafkaConsumerClient:
         if msg.error():
             raise Exception(msg.error())
 
-        return json.loads(msg.value().decode("utf-8"))
+        return self._decode(msg)
 
-    def send_to_dlq(self, message):
-        self.producer.produce(
-            self.dlq_topic,
-            value=json.dumps(message)
+    def consume_batch(self, num_messages: int = None, timeout: float = None):
+        """
+        Micro-batch poll. Returns up to `num_messages` decoded messages,
+        waiting at most `timeout` seconds. Errored messages are logged
+        and undecodable payloads go to the DLQ as-is.
+        """
+        msgs = self.consumer.consume(
+            num_messages or settings.CONSUMER_BATCH_SIZE,
+            timeout=settings.CONSUMER_BATCH_TIMEOUT_SECONDS if timeout is None else timeout
         )
+
+        messages = []
+        for msg in msgs:
+            if msg.error():
+                logger.error(f"Kafka error: {msg.error()}")
+                continue
+            try:
+                messages.append(self._decode(msg))
+            except ValueError:
+                logger.exception("Undecodable message. Sending to DLQ.")
+                self._produce_dlq(msg.key(), msg.value())
+
+        return messages
+
+    def _decode(self, msg):
+        message = json.loads(msg.value().decode("utf-8"))
+
+        # Event time: producer field first, Kafka message timestamp second
+        ts_type, ts_ms = msg.timestamp()
+        if "event_time" not in message and ts_type != TIMESTAMP_NOT_AVAILABLE:
+            message["event_time"] = ts_ms / 1000
+        message["consumed_at"] = time.time()
+        message["kafka_partition"] = msg.partition()
+
+        # Only messages keyed by their customer_id are guaranteed to share
+        # a partition with the rest of that customer's traffic
+        key = msg.key()
+        message["keyed_by_customer"] = (
+            key is not None
+            and key.decode("utf-8", "replace") == str(message.get("customer_id"))
+        )
+
+        return message
+
+    def send_to_dlq(self, message):
+        self._produce_dlq(message.get("customer_id"), json.dumps(message))
+
+    def _produce_dlq(self, key, value):
+        self.producer.produce(self.dlq_topic, key=key, value=value)
         self.producer.flush()
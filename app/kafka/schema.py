@@ -1,3 +1,5 @@
+from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel
 
 class PaymentTransaction(BaseModel):
@@ -7,3 +9,15 @@ class PaymentTransaction(BaseModel):
     feature_1: float
     feature_2: float
     feature_3: float
+
+    # Producer event time, falls back to the Kafka message timestamp
+    event_time: Optional[datetime] = None
+
+    # Set by the consumer when the message was read off the topic
+    consumed_at: Optional[datetime] = None
+
+    # Source partition, set by the consumer
+    kafka_partition: Optional[int] = None
+
+    # Whether the Kafka message key was the customer_id, set by the consumer
+    keyed_by_customer: bool = False
@@ -1,4 +1,5 @@
 import logging
+import signal
 import time
 import os
 import subprocess
@@ -7,10 +8,17 @@ from sqlalchemy.exc import OperationalError
 from app.config.logging_config import setup_logging
 from app.database.connection import engine
 from app.database.models import Base
+from app.database.migrations import upgrade_schema
 from app.database.repository import TransactionRepository
 from app.kafka.consumer import KafkaConsumerClient
 from app.model.loader import ModelLoader
-from app.model.predictor import Predictor
+from app.model.predictor import Predictor, pin_native_threads
+from app.model.cascade import CascadePredictor
+from app.model.score_cache import ScoreCache
+from app.rules.engine import RuleEngine
+from app.config.settings import settings
+from app.services.dedup import RecentTransactionIds
+from app.services.partition_state import PartitionStateStore
 from app.services.scoring_service import ScoringService
 
 
@@ -37,10 +45,36 @@ def ensure_model_exists(logger):
         logger.info("Model training completed.")
 
 
+def process_messages(service, consumer, messages: list):
+    """
+    Score one micro-batch. If the batch fails, retry per message so
+    only the bad message(s) go to the DLQ. Rows already buffered by the
+    failed batch are skipped by the service, not saved twice.
+    """
+    logger = logging.getLogger("payment-scoring")
+    try:
+        service.process_batch(messages)
+    except Exception:
+        logger.exception("Batch processing failed. Retrying per message.")
+        for message in messages:
+            try:
+                service.process(message)
+            except Exception:
+                logger.exception("Processing failed. Sending to DLQ.")
+                consumer.send_to_dlq(message)
+
+
+def handle_sigterm(signum, frame):
+    # docker stop sends SIGTERM, shut down the same way as Ctrl+C
+    raise KeyboardInterrupt
+
+
 def main():
     setup_logging()
     logger = logging.getLogger("payment-scoring")
 
+    pin_native_threads()
+
     # Wait for MySQL readiness
     wait_for_mysql()
 
@@ -48,28 +82,67 @@ def main():
     ensure_model_exists(logger)
 
     Base.metadata.create_all(bind=engine)
-
-    consumer = KafkaConsumerClient()
+    upgrade_schema(engine)
+
+    partition_state = None
+    if settings.PARTITION_STATE_ENABLED:
+        partition_state = PartitionStateStore()
+        consumer = KafkaConsumerClient(
+            on_assign=partition_state.assign,
+            on_revoke=partition_state.revoke
+        )
+    else:
+        consumer = KafkaConsumerClient()
 
     model = ModelLoader.load_model()
     scaler = ModelLoader.load_scaler()
-    predictor = Predictor(model, scaler)
-    service = ScoringService(predictor)
-
+    rule_engine = RuleEngine()
+    cache = ScoreCache() if settings.SCORE_CACHE_ENABLED else None
+
+    if settings.CASCADE_ENABLED:
+        prescreen_model = ModelLoader.load_prescreen_model()
+        model_version = ModelLoader.model_version(
+            settings.MODEL_PATH, settings.SCALER_PATH, settings.PRESCREEN_MODEL_PATH
+        )
+        predictor = CascadePredictor(
+            model, scaler, prescreen_model, rule_engine=rule_engine,
+            cache=cache, model_version=model_version
+        )
+    else:
+        predictor = Predictor(
+            model, scaler, cache=cache, model_version=ModelLoader.model_version()
+        )
+
+    dedup = None
+    if settings.DEDUP_ENABLED:
+        dedup = RecentTransactionIds(confirm=TransactionRepository.exists)
+        dedup.warm_load(
+            TransactionRepository.recent_transaction_ids(settings.DEDUP_BLOOM_CAPACITY)
+        )
+
+    service = ScoringService(
+        predictor, rule_engine=rule_engine, dedup=dedup, partition_state=partition_state
+    )
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
     logger.info("🚀 Real-Time Payment Scoring Started")
 
+    last_stats = time.monotonic()
     try:
         while True:
-            message = consumer.poll()
-            if message:
-                try:
-                    service.process(message)
-                except Exception:
-                    logger.exception("Processing failed. Sending to DLQ.")
-                    consumer.send_to_dlq(message)
+            if time.monotonic() - last_stats >= settings.STATS_LOG_INTERVAL_SECONDS:
+                logger.info(f"[STATS] {service.stats()}")
+                last_stats = time.monotonic()
+
+            messages = consumer.consume_batch()
+            if not messages:
+                continue
+            process_messages(service, consumer, messages)
     except KeyboardInterrupt:
         logger.info("Shutting down... Flushing remaining transactions.")
         TransactionRepository.flush()
+        predictor.close()
+        logger.info(f"[STATS] {service.stats()}")
         logger.info("Shutdown complete.")
 
 
@@ -0,0 +1,108 @@
+import time
+import numpy as np
+from app.config.settings import settings
+from app.model.predictor import Predictor
+from app.rules.engine import RuleEngine
+
+
+class CascadePredictor(Predictor):
+    """
+    Two-tier scoring. A cheap pre-screen model approves clearly
+    low-risk rows; only rows at or above the approve threshold are
+    escalated to the full forest.
+
+    A sample of pre-screen approvals is also scored by the full model
+    to track decision agreement: whether the full score would also be
+    APPROVED under the rule engine thresholds.
+    """
+
+    def __init__(self, model, scaler, prescreen_model,
+                 approve_threshold: float = None, agreement_sample_rate: float = None,
+                 rule_engine: RuleEngine = None, **kwargs):
+        super().__init__(model, scaler, **kwargs)
+        self.prescreen_model = prescreen_model
+        self.rule_engine = rule_engine or RuleEngine()
+        self.approve_threshold = (
+            settings.CASCADE_APPROVE_THRESHOLD
+            if approve_threshold is None else approve_threshold
+        )
+        self.agreement_sample_rate = (
+            settings.CASCADE_AGREEMENT_SAMPLE_RATE
+            if agreement_sample_rate is None else agreement_sample_rate
+        )
+        self._rng = np.random.default_rng()
+
+        self.total = 0
+        self.escalated = 0
+        self.full_rows = 0
+        self.prescreen_seconds = 0.0
+        self.full_seconds = 0.0
+        self.agreement_checked = 0
+        self.agreement_matched = 0
+
+    def reload(self, model, scaler, model_version: str = None, prescreen_model=None):
+        if prescreen_model is not None:
+            self.prescreen_model = prescreen_model
+        super().reload(model, scaler, model_version)
+
+    def _score(self, features_array):
+        scaled = self.scaler.transform(features_array)
+
+        start = time.perf_counter()
+        scores = self._predict_proba(self.prescreen_model, scaled)
+        prescreen_done = time.perf_counter()
+
+        # Escalated rows and the agreement sample share one forest pass;
+        # the forest's per-call overhead dominates at micro-batch sizes
+        escalate = scores >= self.approve_threshold
+        full_rows = escalate | self._agreement_sample(~escalate)
+        if full_rows.any():
+            full_scores = self._predict_proba(self.model, scaled[full_rows])
+            escalated = escalate[full_rows]
+            scores[escalate] = full_scores[escalated]
+            self._record_agreement(full_scores[~escalated])
+        full_done = time.perf_counter()
+
+        self.total += len(scores)
+        self.escalated += int(np.count_nonzero(escalate))
+        self.full_rows += int(np.count_nonzero(full_rows))
+        self.prescreen_seconds += prescreen_done - start
+        self.full_seconds += full_done - prescreen_done
+
+        return scores
+
+    def _agreement_sample(self, approved):
+        """
+        Mask of pre-screen approvals to also score with the full model.
+        """
+        if not self.agreement_sample_rate:
+            return np.zeros_like(approved)
+        return approved & (self._rng.random(len(approved)) < self.agreement_sample_rate)
+
+    def _record_agreement(self, full_scores):
+        """
+        Count how many sampled approvals the full model would also approve.
+        """
+        self.agreement_checked += len(full_scores)
+        self.agreement_matched += sum(
+            self.rule_engine.status_for(score) == "APPROVED" for score in full_scores
+        )
+
+    def stats(self) -> dict:
+        """
+        Counters cover rows actually scored by the cascade. With the
+        score cache enabled, cache hits never reach the cascade and are
+        not included; see the score cache stats for those.
+        """
+        return {
+            "transactions": self.total,
+            "escalation_rate": self.escalated / self.total if self.total else 0.0,
+            "prescreen_ms_per_tx": self.prescreen_seconds * 1000 / self.total if self.total else 0.0,
+            # Full-model rows include the agreement sample
+            "full_ms_per_tx": self.full_seconds * 1000 / self.full_rows if self.full_rows else 0.0,
+            "agreement_checked": self.agreement_checked,
+            "agreement_rate": (
+                self.agreement_matched / self.agreement_checked
+                if self.agreement_checked else 1.0
+            ),
+        }
@@ -1,3 +1,5 @@
+import hashlib
+import io
 import os
 import subprocess
 from app.config.settings import settings
@@ -6,13 +8,51 @@ import joblib
 
 class ModelLoader:
 
-    @staticmethod
-    def load_model():
+    # sha256 of the bytes each artifact was loaded from, by path
+    _loaded_digests = {}
+
+    @classmethod
+    def _load(cls, path: str):
+        with open(path, "rb") as f:
+            data = f.read()
+        cls._loaded_digests[path] = hashlib.sha256(data).hexdigest()
+        return joblib.load(io.BytesIO(data))
+
+    @classmethod
+    def load_model(cls):
         if not os.path.exists(settings.MODEL_PATH):
             print("Model not found. Training automatically...")
             subprocess.run(["python", "scripts/train_dummy_model.py"], check=True)
-        return joblib.load(settings.MODEL_PATH)
+        model = cls._load(settings.MODEL_PATH)
+
+        # Parallelism is owned by Predictor's inference executor
+        if hasattr(model, "n_jobs"):
+            model.n_jobs = 1
+        return model
+
+    @classmethod
+    def load_scaler(cls):
+        return cls._load(settings.SCALER_PATH)
+
+    @classmethod
+    def load_prescreen_model(cls):
+        if not os.path.exists(settings.PRESCREEN_MODEL_PATH):
+            # Fits only the pre-screen, the forest and scaler stay as they are
+            print("Pre-screen model not found. Training automatically...")
+            subprocess.run(
+                ["python", "scripts/train_dummy_model.py", "--prescreen-only"], check=True
+            )
+        return cls._load(settings.PRESCREEN_MODEL_PATH)
 
-    @staticmethod
-    def load_scaler():
-        return joblib.load(settings.SCALER_PATH)
+    @classmethod
+    def model_version(cls, *paths):
+        """
+        Short hash of the artifacts as they were loaded into this
+        process (not as they are on disk now), used to key caches.
+        """
+        digest = hashlib.sha256()
+        for path in paths or (settings.MODEL_PATH, settings.SCALER_PATH):
+            if path not in cls._loaded_digests:
+                raise ValueError(f"Artifact {path} has not been loaded")
+            digest.update(cls._loaded_digests[path].encode())
+        return digest.hexdigest()[:12]
@@ -1,16 +1,118 @@
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+from threadpoolctl import threadpool_limits
+from app.config.settings import settings
+
+
+def available_cores() -> int:
+    """
+    Cores this process may run on, honouring affinity/cgroup cpusets.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def pin_native_threads(threads: int = None):
+    """
+    Cap BLAS/OpenMP thread pools at startup so they do not compete
+    with the inference executor.
+    """
+    threads = threads or settings.NATIVE_THREADS
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    threadpool_limits(limits=threads)
+
 
 class Predictor:
 
-    def __init__(self, model, scaler):
+    def __init__(self, model, scaler, threads: int = None, min_chunk_rows: int = None,
+                 cache=None, model_version: str = None):
         self.model = model
         self.scaler = scaler
+        self.model_version = model_version
+
+        # Optional ScoreCache of raw model output
+        self.cache = cache
+        if cache is not None:
+            cache.set_model_version(model_version)
+
+        # Tree traversal releases the GIL, so large batches are split
+        # across a thread pool owned here instead of joblib's n_jobs
+        self.threads = threads or settings.INFERENCE_THREADS or available_cores()
+        self.min_chunk_rows = min_chunk_rows or settings.INFERENCE_MIN_CHUNK_ROWS
+        self._executor = (
+            ThreadPoolExecutor(self.threads, thread_name_prefix="inference")
+            if self.threads > 1 else None
+        )
 
     def predict(self, features: list):
-        features_array = np.array(features).reshape(1, -1)
+        scores, predictions = self.predict_batch([features])
+
+        return float(scores[0]), int(predictions[0])
+
+    def reload(self, model, scaler, model_version: str = None):
+        """
+        Swap in new artifacts. Cached scores of the old model are dropped.
+        """
+        self.model = model
+        self.scaler = scaler
+        self.model_version = model_version
+        if self.cache is not None:
+            self.cache.set_model_version(model_version)
+
+    def predict_batch(self, features):
+        """
+        Score a batch of feature rows in a single scale + model pass.
+        Returns (scores, predictions) arrays.
+        """
+        features_array = np.asarray(features, dtype=float)
+        features_array = features_array.reshape(features_array.shape[0], -1)
+
+        if self.cache is None:
+            scores = self._score(features_array)
+        else:
+            scores = self._score_cached(features_array)
+        predictions = (scores > 0.5).astype(int)
+
+        return scores, predictions
+
+    def _score(self, features_array):
         scaled = self.scaler.transform(features_array)
+        return self._predict_proba(self.model, scaled)
+
+    def _score_cached(self, features_array):
+        """
+        Serve repeated feature vectors from the cache, score the rest.
+        """
+        keys = self.cache.keys_for(features_array)
+        scores = self.cache.get_many(keys)
+
+        missing = np.isnan(scores)
+        if missing.any():
+            fresh = self._score(features_array[missing])
+            scores[missing] = fresh
+            self.cache.put_many([k for k, m in zip(keys, missing) if m], fresh)
+
+        return scores
+
+    def _predict_proba(self, model, scaled):
+        """
+        Positive-class probabilities. Batches smaller than two chunks
+        run inline, larger ones are split across the executor.
+        """
+        chunks = min(self.threads, math.ceil(len(scaled) / self.min_chunk_rows))
+        if self._executor is None or chunks <= 1:
+            return model.predict_proba(scaled)[:, 1]
 
-        score = float(self.model.predict_proba(scaled)[0][1])
-        prediction = int(score > 0.5)
+        parts = self._executor.map(
+            lambda part: model.predict_proba(part)[:, 1],
+            np.array_split(scaled, chunks)
+        )
+        return np.concatenate(list(parts))
 
-        return score, prediction
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
@@ -0,0 +1,71 @@
+from collections import OrderedDict
+import numpy as np
+from app.config.settings import settings
+
+
+class ScoreCache:
+    """
+    Bounded LRU cache of raw model scores keyed on a rounded feature
+    vector and the model version. Entries from another model version
+    are dropped when the version changes.
+
+    Only raw model output belongs here, never rule-adjusted scores.
+    """
+
+    def __init__(self, max_size: int = None, decimals: int = None, model_version: str = None):
+        self.max_size = max_size or settings.SCORE_CACHE_SIZE
+        self.decimals = settings.SCORE_CACHE_DECIMALS if decimals is None else decimals
+        self.model_version = model_version
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def set_model_version(self, model_version: str):
+        if model_version != self.model_version:
+            self.model_version = model_version
+            self._entries.clear()
+
+    def keys_for(self, features_array: np.ndarray) -> list:
+        """
+        Rounded float bytes per row. Unlike scaling to integers this
+        cannot overflow, so large values never share a key. Adding 0.0
+        folds -0.0 into 0.0.
+        """
+        rounded = np.round(features_array, self.decimals) + 0.0
+        return [row.tobytes() for row in rounded]
+
+    def get_many(self, keys: list) -> np.ndarray:
+        """
+        Cached scores for `keys`, NaN where missing.
+        """
+        scores = np.full(len(keys), np.nan)
+        for i, key in enumerate(keys):
+            score = self._entries.get(key)
+            if score is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                scores[i] = score
+                self.hits += 1
+        return scores
+
+    def put_many(self, keys: list, scores):
+        for key, score in zip(keys, scores):
+            self._entries[key] = float(score)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "model_version": self.model_version,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
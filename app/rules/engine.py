@@ -0,0 +1,292 @@
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.config.settings import settings
+
+logger = logging.getLogger("rule-engine")
+
+DEFAULT_REASON = "ML_MODEL"
+DEFAULT_STATUS = "APPROVED"
+
+# Used when the rules file is missing, mirrors app/config/rules.json
+DEFAULT_RULES = {
+    "thresholds": {"DECLINED": 0.85, "REVIEW": 0.65},
+    "rules": [
+        {
+            "name": "velocity",
+            "reason": "VELOCITY_RULE",
+            "priority": 10,
+            "when": [{"field": "recent_count", "op": ">=", "value": 12}],
+            "action": "boost",
+            "boost": 0.15,
+            "cap": 0.99,
+        }
+    ],
+}
+
+OPERATORS = {
+    ">=": np.greater_equal,
+    ">": np.greater,
+    "<=": np.less_equal,
+    "<": np.less,
+    "==": np.equal,
+    "!=": np.not_equal,
+    "in": np.isin,
+    "not_in": lambda column, value: np.isin(column, value, invert=True),
+}
+
+ACTIONS = ("boost", "override", "flag")
+
+# Columns ScoringService passes to evaluate(), with their value types
+BATCH_FIELDS = {
+    "score": "number",
+    "amount": "number",
+    "recent_count": "number",
+    "customer_id": "string",
+}
+
+# Rank used for "no rule matched yet"
+RANK_FLOOR = np.iinfo(np.int64).min
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    name: str
+    reason: str
+    priority: int
+    conditions: tuple
+    action: str
+    boost: float = 0.0
+    cap: float = 1.0
+    status: str = None
+
+    def mask(self, columns: dict, size: int) -> np.ndarray:
+        """
+        AND all conditions into a single boolean mask over the batch.
+        """
+        mask = np.ones(size, dtype=bool)
+        for field, op, value in self.conditions:
+            mask &= op(columns[field], value)
+        return mask
+
+
+@dataclass(frozen=True)
+class CompiledRuleSet:
+    rules: tuple
+    # (status, threshold) pairs, ascending by threshold
+    thresholds: tuple
+    # Reason lookup table, index -1 is the default reason
+    reasons: np.ndarray
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_condition(rule_name: str, field: str, op: str, value):
+    """
+    Reject conditions evaluate() could not run against a batch.
+    """
+    kind = BATCH_FIELDS.get(field)
+    if kind is None:
+        raise ValueError(
+            f"Unknown field '{field}' in rule {rule_name}. "
+            f"Available: {', '.join(BATCH_FIELDS)}"
+        )
+
+    values = value if op in ("in", "not_in") else [value]
+    if op in ("in", "not_in") and not isinstance(value, list):
+        raise ValueError(f"Operator '{op}' in rule {rule_name} needs a list value")
+    if kind == "string" and op not in ("==", "!=", "in", "not_in"):
+        raise ValueError(f"Operator '{op}' not supported on string field '{field}' in rule {rule_name}")
+
+    check = _is_number if kind == "number" else (lambda v: isinstance(v, str))
+    if not all(check(v) for v in values):
+        raise ValueError(f"Field '{field}' in rule {rule_name} needs {kind} values")
+
+
+def compile_rules(config: dict) -> CompiledRuleSet:
+    """
+    Turn a declarative rule config into NumPy-ready rule objects.
+    Raises ValueError on unknown fields, operators, actions or
+    mistyped values.
+    """
+    rules = []
+    for spec in config.get("rules", []):
+        if not spec.get("enabled", True):
+            continue
+
+        action = spec.get("action", "flag")
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action '{action}' in rule {spec.get('name')}")
+        if action == "override" and not spec.get("status"):
+            raise ValueError(f"Override rule {spec.get('name')} needs a status")
+
+        conditions = []
+        for cond in spec.get("when", []):
+            op = OPERATORS.get(cond["op"])
+            if op is None:
+                raise ValueError(f"Unknown operator '{cond['op']}' in rule {spec.get('name')}")
+            value = cond["value"]
+            _check_condition(spec.get("name"), cond["field"], cond["op"], value)
+            if cond["op"] in ("in", "not_in"):
+                value = np.asarray(list(value))
+            conditions.append((cond["field"], op, value))
+
+        rules.append(CompiledRule(
+            name=spec["name"],
+            reason=spec.get("reason", spec["name"].upper()),
+            priority=int(spec.get("priority", 0)),
+            conditions=tuple(conditions),
+            action=action,
+            boost=float(spec.get("boost", 0.0)),
+            cap=float(spec.get("cap", 1.0)),
+            status=spec.get("status"),
+        ))
+
+    thresholds = config.get("thresholds", DEFAULT_RULES["thresholds"])
+    if not all(_is_number(v) for v in thresholds.values()):
+        raise ValueError("Thresholds must be numbers")
+    thresholds = tuple(sorted(thresholds.items(), key=lambda item: item[1]))
+    reasons = np.array([rule.reason for rule in rules] + [DEFAULT_REASON], dtype=object)
+
+    return CompiledRuleSet(rules=tuple(rules), thresholds=thresholds, reasons=reasons)
+
+
+class RuleEngine:
+    """
+    Declarative scoring rules evaluated as vectorized operations over
+    a scored batch. Rules are loaded from a JSON file and hot reloaded
+    when the file changes.
+    """
+
+    def __init__(self, path: str = None, reload_interval: float = None):
+        self.path = path or settings.RULES_PATH
+        self.reload_interval = (
+            settings.RULES_RELOAD_INTERVAL_SECONDS
+            if reload_interval is None else reload_interval
+        )
+        self.hits = {}
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._last_check = time.monotonic()
+        self._ruleset = None
+        self.load()
+
+    def load(self):
+        """
+        (Re)load and compile rules. The active rule set is swapped
+        atomically so concurrent evaluations never see a partial set.
+        """
+        if os.path.exists(self.path):
+            mtime = os.path.getmtime(self.path)
+            with open(self.path) as f:
+                config = json.load(f)
+        else:
+            logger.warning(f"Rules file {self.path} not found. Using built-in defaults.")
+            mtime = None
+            config = DEFAULT_RULES
+
+        ruleset = compile_rules(config)
+
+        with self._lock:
+            self._ruleset = ruleset
+            self._mtime = mtime
+            for rule in ruleset.rules:
+                self.hits.setdefault(rule.name, 0)
+
+        logger.info(f"Loaded {len(ruleset.rules)} scoring rules from {self.path}")
+
+    def maybe_reload(self):
+        """
+        Reload rules if the file changed. Checks at most once per
+        reload interval. A broken file keeps the previous rules active.
+        """
+        now = time.monotonic()
+        if now - self._last_check < self.reload_interval:
+            return
+        self._last_check = now
+
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+
+        if mtime != self._mtime:
+            try:
+                self.load()
+            except Exception:
+                # Any broken config must not take down scoring
+                logger.exception("Rule reload failed. Keeping previous rules.")
+                self._mtime = mtime
+
+    def status_for(self, score: float) -> str:
+        """
+        Threshold-only classification for a single score.
+        """
+        status = DEFAULT_STATUS
+        for name, threshold in self._ruleset.thresholds:
+            if score >= threshold:
+                status = name
+        return status
+
+    def evaluate(self, columns: dict):
+        """
+        Apply all rules to a batch.
+
+        `columns` maps field names to equal-length arrays and must
+        include `score`. Returns (scores, statuses, reasons) arrays.
+        Boosts apply in declaration order; overrides and reasons are
+        resolved by rule priority (first declared wins ties).
+        """
+        ruleset = self._ruleset
+        scores = np.array(columns["score"], dtype=float)
+        size = scores.shape[0]
+
+        reason_idx = np.full(size, -1, dtype=np.intp)
+        reason_rank = np.full(size, RANK_FLOOR, dtype=np.int64)
+        override_status = None
+        override_rank = None
+
+        for idx, rule in enumerate(ruleset.rules):
+            mask = rule.mask(columns, size)
+            hit_count = int(np.count_nonzero(mask))
+            if not hit_count:
+                continue
+            self.hits[rule.name] += hit_count
+
+            if rule.action == "boost":
+                scores = np.where(mask, np.minimum(scores + rule.boost, rule.cap), scores)
+            elif rule.action == "override":
+                if override_status is None:
+                    override_status = np.full(size, None, dtype=object)
+                    override_rank = np.full(size, RANK_FLOOR, dtype=np.int64)
+                wins = mask & (rule.priority > override_rank)
+                override_status[wins] = rule.status
+                override_rank[wins] = rule.priority
+
+            wins = mask & (rule.priority > reason_rank)
+            reason_idx[wins] = idx
+            reason_rank[wins] = rule.priority
+
+        statuses = np.full(size, DEFAULT_STATUS, dtype=object)
+        for name, threshold in ruleset.thresholds:
+            statuses[scores >= threshold] = name
+
+        if override_status is not None:
+            overridden = override_rank > RANK_FLOOR
+            statuses[overridden] = override_status[overridden]
+
+        return scores, statuses, ruleset.reasons[reason_idx]
+
+    def stats(self) -> dict:
+        """
+        Per-rule hit counters since startup.
+        """
+        return dict(self.hits)
@@ -0,0 +1,144 @@
+import hashlib
+import logging
+import math
+import sys
+from collections import OrderedDict
+
+from app.config.settings import settings
+
+logger = logging.getLogger("dedup")
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter sized for `capacity` items at `fp_rate`.
+    Uses double hashing over a single blake2b digest.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def estimated_fp_rate(self) -> float:
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+
+    def memory_bytes(self) -> int:
+        return len(self.bits)
+
+
+class RecentTransactionIds:
+    """
+    Bounded set of recently persisted transaction IDs.
+
+    Two rotating bloom filters cover the long window, an exact LRU
+    covers the most recent IDs. A bloom hit that is not in the LRU is
+    confirmed with `confirm` (e.g. a DB lookup) so a false positive
+    never drops a legitimate payment.
+    """
+
+    def __init__(self, capacity: int = None, fp_rate: float = None,
+                 lru_size: int = None, confirm=None):
+        self.capacity = capacity or settings.DEDUP_BLOOM_CAPACITY
+        self.fp_rate = fp_rate or settings.DEDUP_BLOOM_FP_RATE
+        self.lru_size = lru_size or settings.DEDUP_LRU_SIZE
+        self.confirm = confirm
+
+        self.current = BloomFilter(self.capacity, self.fp_rate)
+        self.previous = None
+        self.recent = OrderedDict()
+
+        self.checks = 0
+        self.duplicates = 0
+        self.bloom_hits = 0
+        self.false_positives = 0
+
+    def add(self, transaction_id: str):
+        if self.current.count >= self.capacity:
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.fp_rate)
+
+        self.current.add(transaction_id)
+        self.recent[transaction_id] = None
+        if len(self.recent) > self.lru_size:
+            self.recent.popitem(last=False)
+
+    def _maybe_seen(self, transaction_id: str) -> bool:
+        return (
+            transaction_id in self.current
+            or (self.previous is not None and transaction_id in self.previous)
+        )
+
+    def is_duplicate(self, transaction_id: str) -> bool:
+        """
+        Return True if the ID was already persisted. Does not record
+        the ID; call `add` once the transaction has been saved.
+        """
+        self.checks += 1
+
+        if transaction_id in self.recent:
+            self.recent.move_to_end(transaction_id)
+            self.duplicates += 1
+            return True
+
+        if self._maybe_seen(transaction_id):
+            self.bloom_hits += 1
+            if self.confirm is None or self.confirm(transaction_id):
+                self.duplicates += 1
+                return True
+            self.false_positives += 1
+
+        return False
+
+    def warm_load(self, transaction_ids):
+        """
+        Seed from already-persisted IDs, oldest first.
+        """
+        loaded = 0
+        for transaction_id in transaction_ids:
+            self.add(transaction_id)
+            loaded += 1
+        logger.info(f"Dedup filter warm-loaded with {loaded} transaction IDs")
+
+    def estimated_fp_rate(self) -> float:
+        rate = self.current.estimated_fp_rate()
+        if self.previous is not None:
+            rate = 1 - (1 - rate) * (1 - self.previous.estimated_fp_rate())
+        return rate
+
+    def memory_bytes(self) -> int:
+        bloom = self.current.memory_bytes()
+        if self.previous is not None:
+            bloom += self.previous.memory_bytes()
+        lru = sys.getsizeof(self.recent) + sum(sys.getsizeof(k) for k in self.recent)
+        return bloom + lru
+
+    def stats(self) -> dict:
+        # FP rate over the IDs that really were new
+        new_ids = self.checks - self.duplicates
+        return {
+            "checks": self.checks,
+            "duplicates": self.duplicates,
+            "bloom_hits": self.bloom_hits,
+            "false_positives": self.false_positives,
+            "observed_fp_rate": self.false_positives / new_ids if new_ids else 0.0,
+            "estimated_fp_rate": self.estimated_fp_rate(),
+            "memory_bytes": self.memory_bytes(),
+        }
@@ -0,0 +1,172 @@
+import bisect
+import logging
+from datetime import datetime, timedelta
+
+from app.config.settings import settings
+from app.database.repository import TransactionRepository
+
+logger = logging.getLogger("partition-state")
+
+
+class PartitionState:
+    """
+    Velocity state for the customers routed to one partition.
+    Keeps a sorted list of event times per customer and the highest
+    event time recorded (the partition's watermark).
+    """
+
+    def __init__(self, partition: int, retention: timedelta, lateness: timedelta = timedelta(0)):
+        self.partition = partition
+        self.retention = retention
+        self.lateness = lateness
+        self.customers = {}
+        self.watermark = None
+        self.late_events = 0
+
+    def covers(self, event_time: datetime) -> bool:
+        """
+        Whether local state holds the full velocity window ending at
+        `event_time`. Events later than the allowed lateness behind the
+        watermark may fall into pruned state, they are counted as late.
+        """
+        if self.watermark is None or event_time >= self.watermark - self.lateness:
+            return True
+        self.late_events += 1
+        return False
+
+    def record(self, customer_id: str, event_time: datetime):
+        events = self.customers.setdefault(customer_id, [])
+        if not events or event_time >= events[-1]:
+            events.append(event_time)
+        else:
+            bisect.insort(events, event_time)
+
+        if self.watermark is None or event_time > self.watermark:
+            self.watermark = event_time
+
+    def count(self, customer_id: str, until: datetime, seconds: int) -> int:
+        events = self.customers.get(customer_id)
+        if not events:
+            return 0
+        start = bisect.bisect_left(events, until - timedelta(seconds=seconds))
+        end = bisect.bisect_right(events, until)
+        return end - start
+
+    def prune(self):
+        """
+        Drop events older than the retention behind this partition's
+        watermark. Uses event time, so catch-up or consume lag never
+        discards live state.
+        """
+        if self.watermark is None:
+            return
+        older_than = self.watermark - self.retention
+        for customer_id in list(self.customers):
+            events = self.customers[customer_id]
+            cut = bisect.bisect_left(events, older_than)
+            if cut == len(events):
+                del self.customers[customer_id]
+            elif cut:
+                del events[:cut]
+
+
+class PartitionStateStore:
+    """
+    Per-partition velocity state owned by this consumer instance.
+
+    Producers key by customer_id, so every customer lives on exactly
+    one partition. State is rebuilt from MySQL when a partition is
+    assigned and dropped when it is revoked.
+    """
+
+    def __init__(self, window_seconds: int = None, lateness_seconds: float = None):
+        self.window_seconds = window_seconds or settings.VELOCITY_WINDOW_SECONDS
+        self.lateness_seconds = (
+            settings.VELOCITY_ALLOWED_LATENESS_SECONDS
+            if lateness_seconds is None else lateness_seconds
+        )
+        self.partitions = {}
+        self.unkeyed_events = 0
+        self._records_since_prune = 0
+
+    @property
+    def retention(self) -> timedelta:
+        return timedelta(seconds=self.window_seconds + self.lateness_seconds)
+
+    def owns(self, partition) -> bool:
+        return partition in self.partitions
+
+    def assign(self, partitions: list):
+        """
+        Rebuild state for newly assigned partitions from the rows
+        within retention of each partition's newest stored event.
+        """
+        new = [p for p in partitions if p not in self.partitions]
+        if not new:
+            return
+
+        latest = TransactionRepository.latest_partition_event_times(new)
+        loaded = 0
+        for partition in new:
+            state = PartitionState(
+                partition, self.retention, timedelta(seconds=self.lateness_seconds)
+            )
+            if latest.get(partition) is not None:
+                since = latest[partition] - self.retention
+                for customer_id, event_time in TransactionRepository.recent_partition_events(partition, since):
+                    state.record(customer_id, event_time)
+                    loaded += 1
+            self.partitions[partition] = state
+
+        logger.info(f"Assigned partitions {new}, rebuilt from {loaded} events")
+
+    def revoke(self, partitions: list):
+        """
+        Flush pending rows so the next owner can rebuild from them,
+        then drop local state.
+        """
+        TransactionRepository.flush()
+        for partition in partitions:
+            self.partitions.pop(partition, None)
+
+        logger.info(f"Revoked partitions {list(partitions)}")
+
+    def covers(self, partition, event_time: datetime, keyed: bool = True) -> bool:
+        """
+        Whether local state can count this event. Messages not keyed by
+        customer_id may share their partition with only part of the
+        customer's traffic, so they are never served locally.
+        """
+        if not keyed:
+            if not self.unkeyed_events:
+                logger.warning(
+                    "Messages not keyed by customer_id. Counting their velocity from MySQL."
+                )
+            self.unkeyed_events += 1
+            return False
+
+        state = self.partitions.get(partition)
+        return state is not None and state.covers(event_time)
+
+    def count_recent(self, partition: int, customer_id: str, until: datetime) -> int:
+        return self.partitions[partition].count(customer_id, until, self.window_seconds)
+
+    def record(self, partition: int, customer_id: str, event_time: datetime):
+        state = self.partitions.get(partition)
+        if state is None:
+            return
+        state.record(customer_id, event_time)
+
+        self._records_since_prune += 1
+        if self._records_since_prune >= 1000:
+            self._records_since_prune = 0
+            for state in self.partitions.values():
+                state.prune()
+
+    def stats(self) -> dict:
+        return {
+            "partitions": sorted(self.partitions),
+            "customers": sum(len(state.customers) for state in self.partitions.values()),
+            "late_events": sum(state.late_events for state in self.partitions.values()),
+            "unkeyed_events": self.unkeyed_events,
+        }
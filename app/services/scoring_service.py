@@ -1,91 +1,219 @@
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from app.config.settings import settings
 from app.kafka.schema import PaymentTransaction
 from app.database.repository import TransactionRepository
-
-VELOCITY_THRESHOLD = 12  # 12 tx in 60 seconds
-VELOCITY_WINDOW_SECONDS = 60
+from app.rules.engine import RuleEngine
+from app.services.dedup import RecentTransactionIds
+from app.services.partition_state import PartitionStateStore
 
 logger = logging.getLogger("scoring-service")
 
 
+def to_utc_naive(value: datetime, default: datetime) -> datetime:
+    """
+    Normalize to naive UTC, matching how timestamps are stored.
+    """
+    if value is None:
+        return default
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 class ScoringService:
 
-    def __init__(self, predictor):
+    def __init__(self, predictor, rule_engine: RuleEngine = None,
+                 dedup: RecentTransactionIds = None,
+                 partition_state: PartitionStateStore = None):
         self.predictor = predictor
+        self.rule_engine = rule_engine or RuleEngine()
+        self.dedup = dedup
+        self.partition_state = partition_state
 
     def determine_status(self, score: float) -> str:
         """
         Final classification strictly based on risk score.
+        Thresholds come from the rule engine config.
+        """
+        return self.rule_engine.status_for(score)
+
+    def count_recent(self, transaction: PaymentTransaction, until: datetime) -> int:
+        """
+        Velocity count over the event's own window ending at `until`.
+        Served from local partition state when the message was keyed by
+        its customer, this instance owns the partition and the event is
+        within the allowed lateness of that partition's watermark. Other
+        messages are counted from MySQL.
+        """
+        if self.partition_state is not None and self.partition_state.covers(
+            transaction.kafka_partition, until, keyed=transaction.keyed_by_customer
+        ):
+            return self.partition_state.count_recent(
+                transaction.kafka_partition, transaction.customer_id, until
+            )
+
+        return TransactionRepository.count_recent_transactions(
+            transaction.customer_id,
+            seconds=settings.VELOCITY_WINDOW_SECONDS,
+            until=until
+        )
+
+    def count_recent_batch(self, transactions: list, event_times: list) -> np.ndarray:
         """
-        if score >= 0.85:
-            return "DECLINED"
-        elif score >= 0.65:
-            return "REVIEW"
-        else:
-            return "APPROVED"
+        Velocity counts for a batch. Earlier transactions of the same
+        customer in this batch are not persisted or recorded yet, so
+        they are added on top of the stored count.
+        """
+        window = timedelta(seconds=settings.VELOCITY_WINDOW_SECONDS)
+        pending = {}
+        counts = []
+        for transaction, event_time in zip(transactions, event_times):
+            earlier = pending.setdefault(transaction.customer_id, [])
+            counts.append(
+                self.count_recent(transaction, event_time)
+                + sum(1 for e in earlier if event_time - window <= e <= event_time)
+            )
+            earlier.append(event_time)
+        return np.array(counts)
+
+    def stats(self) -> dict:
+        """
+        Counters of every enabled component, for periodic logging.
+        """
+        stats = {"rules": self.rule_engine.stats()}
+        if self.dedup is not None:
+            stats["dedup"] = self.dedup.stats()
+        if self.partition_state is not None:
+            stats["partitions"] = self.partition_state.stats()
+        if getattr(self.predictor, "cache", None) is not None:
+            stats["score_cache"] = self.predictor.cache.stats()
+        if hasattr(self.predictor, "stats"):
+            stats["predictor"] = self.predictor.stats()
+        return stats
 
     def process(self, raw_message: dict):
+        self.process_batch([raw_message])
+
+    def process_batch(self, raw_messages: list):
 
         start_time = datetime.utcnow()
 
-        transaction = PaymentTransaction(**raw_message)
+        transactions = [PaymentTransaction(**raw) for raw in raw_messages]
+
+        # ----------------------------
+        # Idempotency Pre-check
+        # ----------------------------
+        # Still-buffered IDs are skipped even without dedup, e.g. when a
+        # batch whose flush failed is retried per message
+        seen = TransactionRepository.buffered_ids()
+        unique = []
+        for t in transactions:
+            if t.transaction_id in seen or (
+                self.dedup is not None and self.dedup.is_duplicate(t.transaction_id)
+            ):
+                logger.info(f"[DUPLICATE] Tx={t.transaction_id} skipped")
+                continue
+            seen.add(t.transaction_id)
+            unique.append(t)
+        transactions = unique
+
+        if not transactions:
+            return
 
         features = [
-            transaction.feature_1,
-            transaction.feature_2,
-            transaction.feature_3
+            [t.feature_1, t.feature_2, t.feature_3]
+            for t in transactions
         ]
 
         # ----------------------------
-        # ML Prediction
+        # Event Time
         # ----------------------------
-        score, prediction = self.predictor.predict(features)
-        reason = "ML_MODEL"
+        consumed_times = [to_utc_naive(t.consumed_at, start_time) for t in transactions]
+        # Clamp to consume time to absorb producer clock skew
+        event_times = [
+            min(to_utc_naive(t.event_time, consumed), consumed)
+            for t, consumed in zip(transactions, consumed_times)
+        ]
 
         # ----------------------------
-        # Velocity Rule
+        # ML Prediction
         # ----------------------------
-        recent_count = TransactionRepository.count_recent_transactions(
-            transaction.customer_id,
-            seconds=VELOCITY_WINDOW_SECONDS
-        )
-
-        if recent_count >= VELOCITY_THRESHOLD:
-            reason = "VELOCITY_RULE"
+        scores, predictions = self.predictor.predict_batch(features)
 
-            # Soft risk boost (controlled impact)
-            score = min(score + 0.15, 0.99)
-
-            logger.warning(
-                f"[VELOCITY_ALERT] Customer={transaction.customer_id} "
-                f"RecentTx={recent_count}"
-            )
+        # ----------------------------
+        # Velocity Lookup
+        # ----------------------------
+        recent_counts = self.count_recent_batch(transactions, event_times)
 
         # ----------------------------
-        # Final Decision
+        # Rules + Final Decision
         # ----------------------------
-        status = self.determine_status(score)
+        self.rule_engine.maybe_reload()
+        scores, statuses, reasons = self.rule_engine.evaluate({
+            "score": scores,
+            "amount": np.array([t.amount for t in transactions]),
+            "customer_id": np.array([t.customer_id for t in transactions], dtype=object),
+            "recent_count": recent_counts,
+        })
 
         processed_time = datetime.utcnow()
         latency_ms = (processed_time - start_time).total_seconds() * 1000
 
-        logger.info(
-            f"[SCORING] Tx={transaction.transaction_id} | "
-            f"Score={score:.4f} | Status={status} | "
-            f"Reason={reason} | Latency={latency_ms:.2f}ms"
-        )
+        rows = []
+        for i, transaction in enumerate(transactions):
+            score = float(scores[i])
+            status = statuses[i]
+            reason = reasons[i]
+
+            # End-to-end latency = consume lag + processing time
+            consume_lag_ms = (consumed_times[i] - event_times[i]).total_seconds() * 1000
+            e2e_latency_ms = (processed_time - event_times[i]).total_seconds() * 1000
+
+            if reason == "VELOCITY_RULE":
+                logger.warning(
+                    f"[VELOCITY_ALERT] Customer={transaction.customer_id} "
+                    f"RecentTx={recent_counts[i]}"
+                )
+
+            logger.info(
+                f"[SCORING] Tx={transaction.transaction_id} | "
+                f"Score={score:.4f} | Status={status} | "
+                f"Reason={reason} | Latency={latency_ms:.2f}ms | "
+                f"Lag={consume_lag_ms:.2f}ms | E2E={e2e_latency_ms:.2f}ms"
+            )
+
+            rows.append({
+                "transaction_id": transaction.transaction_id,
+                "customer_id": transaction.customer_id,
+                "amount": transaction.amount,
+                "kafka_partition": transaction.kafka_partition,
+                "score": score,
+                "prediction": int(predictions[i]),
+                "status": status,
+                "reason": reason,
+                "event_time": event_times[i],
+                "processed_at": processed_time,
+                "consume_lag_ms": consume_lag_ms,
+                "latency_ms": e2e_latency_ms
+            })
 
         # ----------------------------
         # Persist
         # ----------------------------
-        TransactionRepository.save({
-            "transaction_id": transaction.transaction_id,
-            "customer_id": transaction.customer_id,
-            "amount": transaction.amount,
-            "score": score,
-            "prediction": prediction,
-            "status": status,
-            "reason": reason,
-            "processed_at": processed_time
-        })
+        # The whole batch is scored before anything is buffered, so a
+        # failure above leaves nothing half-saved
+        try:
+            TransactionRepository.save_many(rows)
+        finally:
+            # save_many buffers every row before its flush can fail and a
+            # later flush retries them, so they count as seen either way
+            for transaction, event_time in zip(transactions, event_times):
+                if self.dedup is not None:
+                    self.dedup.add(transaction.transaction_id)
+
+                if self.partition_state is not None:
+                    self.partition_state.record(
+                        transaction.kafka_partition, transaction.customer_id, event_time
+                    )
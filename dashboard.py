@@ -98,7 +98,7 @@ def load_throughput():
     query = """
         SELECT COUNT(*) as tx_last_min
         FROM scored_transactions
-        WHERE created_at >= NOW() - INTERVAL 1 MINUTE
+        WHERE event_time >= NOW() - INTERVAL 1 MINUTE
     """
     return pd.read_sql(query, engine)
 
@@ -115,10 +115,11 @@ def load_fraud_source_breakdown():
 def load_latency_metrics():
     query = """
         SELECT 
-            AVG(TIMESTAMPDIFF(MICROSECOND, created_at, processed_at))/1000 as avg_latency_ms,
-            MAX(TIMESTAMPDIFF(MICROSECOND, created_at, processed_at))/1000 as max_latency_ms
+            AVG(consume_lag_ms) as avg_consume_lag_ms,
+            AVG(latency_ms) as avg_latency_ms,
+            MAX(latency_ms) as max_latency_ms
         FROM scored_transactions
-        WHERE processed_at IS NOT NULL
+        WHERE latency_ms IS NOT NULL
     """
     return pd.read_sql(query, engine)
 
@@ -152,7 +153,7 @@ def load_velocity_suspects(window):
     query = f"""
         SELECT customer_id, COUNT(*) as tx_count
         FROM scored_transactions
-        WHERE created_at >= NOW() - INTERVAL {window} MINUTE
+        WHERE event_time >= NOW() - INTERVAL {window} MINUTE
         GROUP BY customer_id
         HAVING tx_count >= 8
         ORDER BY tx_count DESC
@@ -0,0 +1,52 @@
+import os
+import statistics
+import sys
+import time
+import numpy as np
+import joblib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config.settings import settings
+from app.model.cascade import CascadePredictor
+from app.model.predictor import Predictor
+
+# Compares per-batch scoring time of the full forest and the cascade at
+# the configured micro-batch size. Run after train_dummy_model.py.
+# Exits non-zero if the cascade is not faster.
+ROUNDS = 50
+
+model = joblib.load(settings.MODEL_PATH)
+model.n_jobs = 1
+scaler = joblib.load(settings.SCALER_PATH)
+prescreen_model = joblib.load(settings.PRESCREEN_MODEL_PATH)
+
+full = Predictor(model, scaler, threads=1)
+cascade = CascadePredictor(model, scaler, prescreen_model, threads=1)
+
+# Same distribution as the synthetic training data
+rng = np.random.default_rng(42)
+batches = [rng.random((settings.CONSUMER_BATCH_SIZE, 3)) for _ in range(ROUNDS)]
+
+
+def ms_per_batch(predictor):
+    predictor.predict_batch(batches[0])  # warm-up
+    timings = []
+    for batch in batches:
+        start = time.perf_counter()
+        predictor.predict_batch(batch)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+full_ms = ms_per_batch(full)
+cascade_ms = ms_per_batch(cascade)
+stats = cascade.stats()
+
+print(f"Batch size: {settings.CONSUMER_BATCH_SIZE}, "
+      f"agreement sample rate: {cascade.agreement_sample_rate}")
+print(f"Full model: {full_ms:.2f} ms/batch")
+print(f"Cascade:    {cascade_ms:.2f} ms/batch "
+      f"(escalation rate {stats['escalation_rate']:.2%})")
+
+sys.exit(0 if cascade_ms < full_ms else 1)
@@ -7,10 +7,14 @@ from confluent_kafka import Producer
 
 KAFKA_SERVER = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "kafka:9092")
 
+# Key by customer_id so one customer always lands on one partition
+KEY_BY_CUSTOMER = os.getenv("PRODUCER_KEY_BY_CUSTOMER", "true").lower() == "true"
+
 producer = Producer({
     "bootstrap.servers": KAFKA_SERVER,
     "linger.ms": 5,              # allow batching
-    "batch.num.messages": 1000   # improve throughput
+    "batch.num.messages": 1000,  # improve throughput
+    "partitioner": "murmur2_random"  # same key -> partition mapping as Java clients
 })
 
 CUSTOMER_POOL = [f"CUST_{i}" for i in range(1, 201)]
@@ -25,6 +29,7 @@ def generate_transaction():
         "feature_1": random.uniform(0.7, 1.0) if is_fraud else random.uniform(0.1, 0.5),
         "feature_2": random.uniform(0.7, 1.0) if is_fraud else random.uniform(0.1, 0.5),
         "feature_3": random.uniform(0.7, 1.0) if is_fraud else random.uniform(0.1, 0.5),
+        "event_time": time.time(),
     }
 
 def run_producer():
@@ -35,7 +40,8 @@ def run_producer():
         while True:
             data = generate_transaction()
 
-            producer.produce("payments", value=json.dumps(data))
+            key = data["customer_id"] if KEY_BY_CUSTOMER else None
+            producer.produce("payments", key=key, value=json.dumps(data))
             producer.poll(0)
 
             count += 1
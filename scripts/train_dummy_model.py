@@ -1,10 +1,21 @@
 import os
+import sys
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 import joblib
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config.settings import settings
+from app.rules.engine import RuleEngine
+
+# --prescreen-only: fit just the pre-screen against the existing scaler,
+# leaving the forest and scaler artifacts untouched
+PRESCREEN_ONLY = "--prescreen-only" in sys.argv
+
 # Create synthetic dataset
 np.random.seed(42)
 
@@ -12,21 +23,45 @@ X = np.random.rand(5000, 3)  # 3 features
 y = (X[:, 0] + X[:, 1] * 0.5 + X[:, 2] * 0.2 > 0.9).astype(int)
 
 # Split
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
+X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
 # Scale
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
+if PRESCREEN_ONLY:
+    scaler = joblib.load(settings.SCALER_PATH)
+    X_train_scaled = scaler.transform(X_train)
+else:
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
 
 # Train model
-model = RandomForestClassifier(n_estimators=100)
-model.fit(X_train_scaled, y_train)
+if PRESCREEN_ONLY:
+    model = joblib.load(settings.MODEL_PATH)
+else:
+    model = RandomForestClassifier(n_estimators=100, random_state=42)
+    model.fit(X_train_scaled, y_train)
+
+# Cheap pre-screen model for the scoring cascade
+prescreen_model = LogisticRegression()
+prescreen_model.fit(X_train_scaled, y_train)
+
+# Cascade report on the held-out split: agreement means the full
+# model's score would also end up APPROVED under the rule thresholds
+rule_engine = RuleEngine()
+X_test_scaled = scaler.transform(X_test)
+prescreen_scores = prescreen_model.predict_proba(X_test_scaled)[:, 1]
+full_scores = model.predict_proba(X_test_scaled)[:, 1]
+approved = prescreen_scores < settings.CASCADE_APPROVE_THRESHOLD
+agreed = [rule_engine.status_for(score) == "APPROVED" for score in full_scores[approved]]
+print(f"Cascade escalation rate: {1 - approved.mean():.2%}")
+print(f"Cascade approval agreement: {np.mean(agreed):.2%}")
 
 # Create folder if not exists
-os.makedirs("model_artifacts", exist_ok=True)
+os.makedirs(os.path.dirname(settings.PRESCREEN_MODEL_PATH), exist_ok=True)
 
 # Save artifacts
-joblib.dump(model, "model_artifacts/fraud_model.pkl")
-joblib.dump(scaler, "model_artifacts/scaler.pkl")
+if not PRESCREEN_ONLY:
+    joblib.dump(model, settings.MODEL_PATH)
+    joblib.dump(scaler, settings.SCALER_PATH)
+joblib.dump(prescreen_model, settings.PRESCREEN_MODEL_PATH)
 
 print("Dummy fraud model trained and saved successfully.")
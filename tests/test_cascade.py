@@ -0,0 +1,35 @@
+import numpy as np
+from app.model.cascade import CascadePredictor
+
+class FirstFeatureModel:
+    def predict_proba(self, X):
+        return np.column_stack([1 - X[:, 0], X[:, 0]])
+
+class FullModel:
+    def __init__(self):
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return np.tile([0.4, 0.6], (len(X), 1))
+
+class DummyScaler:
+    def transform(self, X):
+        return X
+
+def test_cascade_escalates_only_uncertain_rows():
+    full_model = FullModel()
+    predictor = CascadePredictor(full_model, DummyScaler(), FirstFeatureModel(),
+                                 approve_threshold=0.2, agreement_sample_rate=1.0)
+    scores, predictions = predictor.predict_batch([[0.05, 0, 0], [0.1, 0, 0], [0.6, 0, 0]])
+
+    assert np.allclose(scores, [0.05, 0.1, 0.6])
+    assert list(predictions) == [0, 0, 1]
+    # Escalated row and agreement sample share a single forest pass
+    assert full_model.calls == 1
+
+    stats = predictor.stats()
+    assert stats["escalation_rate"] == 1 / 3
+    assert stats["agreement_checked"] == 2
+    # 0.6 is below the REVIEW threshold, so the full model also approves
+    assert stats["agreement_rate"] == 1.0
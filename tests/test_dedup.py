@@ -0,0 +1,56 @@
+from app.database.repository import TransactionRepository
+from app.services.dedup import RecentTransactionIds
+from app.services.scoring_service import ScoringService
+
+def test_duplicates_detected_and_false_positives_confirmed():
+    persisted = set()
+    dedup = RecentTransactionIds(capacity=100, fp_rate=0.01, lru_size=10,
+                                 confirm=lambda tx_id: tx_id in persisted)
+    dedup.warm_load(["TX_OLD"])
+    persisted.add("TX_OLD")
+
+    assert dedup.is_duplicate("TX_1") is False
+    # Not recorded until saved, so a failed message can be redelivered
+    assert dedup.is_duplicate("TX_1") is False
+    dedup.add("TX_1")
+    assert dedup.is_duplicate("TX_1") is True
+    assert dedup.is_duplicate("TX_OLD") is True
+
+    # Evicted from the LRU, still caught by the bloom filter + confirm
+    for i in range(20):
+        dedup.add(f"TX_FILL_{i}")
+    persisted.add("TX_1")
+    assert dedup.is_duplicate("TX_1") is True
+
+    stats = dedup.stats()
+    assert stats["duplicates"] == 3
+    assert stats["memory_bytes"] > 0
+
+def test_bloom_rotation_keeps_previous_generation():
+    dedup = RecentTransactionIds(capacity=5, fp_rate=0.01, lru_size=1,
+                                 confirm=lambda tx_id: True)
+    for i in range(8):
+        dedup.add(f"TX_{i}")
+
+    assert dedup.previous is not None
+    assert dedup.is_duplicate("TX_0") is True
+
+class FailingPredictor:
+    def predict_batch(self, features):
+        raise RuntimeError("model failed")
+
+def test_failed_batch_ids_not_marked_seen(monkeypatch):
+    monkeypatch.setattr(TransactionRepository, "_buffer", [])
+
+    dedup = RecentTransactionIds(capacity=100, fp_rate=0.01, lru_size=10)
+    service = ScoringService(FailingPredictor(), dedup=dedup)
+    message = {"transaction_id": "TX_1", "customer_id": "CUST_1", "amount": 10.0,
+               "feature_1": 0.1, "feature_2": 0.1, "feature_3": 0.1}
+
+    try:
+        service.process(message)
+    except RuntimeError:
+        pass
+
+    assert dedup.is_duplicate("TX_1") is False
+    assert TransactionRepository._buffer == []
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta, timezone
+from app.database.repository import TransactionRepository
+from app.kafka.schema import PaymentTransaction
+from app.services.partition_state import PartitionState, PartitionStateStore
+from app.services.scoring_service import ScoringService, to_utc_naive
+
+class DummyPredictor:
+    def predict(self, features):
+        return 0.1, 0
+
+def make_transaction(partition):
+    return PaymentTransaction(transaction_id="TX_1", customer_id="CUST_1", amount=10.0,
+                              feature_1=0.1, feature_2=0.1, feature_3=0.1,
+                              kafka_partition=partition, keyed_by_customer=True)
+
+def test_late_events_counted_over_own_window_per_partition(monkeypatch):
+    mysql_windows = []
+    monkeypatch.setattr(TransactionRepository, "count_recent_transactions",
+                        staticmethod(lambda customer_id, seconds, until: mysql_windows.append(until) or 0))
+
+    store = PartitionStateStore(window_seconds=60, lateness_seconds=5)
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    lagging = now - timedelta(minutes=10)
+    for partition, watermark in ((0, now), (1, lagging)):
+        store.partitions[partition] = PartitionState(partition, store.retention, timedelta(seconds=5))
+        store.record(partition, "CUST_1", watermark)
+
+    service = ScoringService(DummyPredictor(), partition_state=store)
+
+    # A lagging partition is not "late" relative to another partition's events
+    assert service.count_recent(make_transaction(1), lagging) == 1
+    assert service.count_recent(make_transaction(0), now - timedelta(seconds=2)) == 0
+
+    # Beyond the allowed lateness: counted over its own window from MySQL
+    late = now - timedelta(minutes=5)
+    service.count_recent(make_transaction(0), late)
+    assert mysql_windows == [late]
+    assert store.stats()["late_events"] == 1
+
+def test_event_time_normalized_to_naive_utc():
+    aware = datetime(2024, 1, 1, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+    assert to_utc_naive(aware, None) == datetime(2024, 1, 1, 12, 0)
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+from app.database import repository
+from app.database.migrations import upgrade_schema
+from app.database.repository import TransactionRepository
+
+# scored_transactions as created before event time was tracked
+PRE_EVENT_TIME_TABLE = """
+    CREATE TABLE scored_transactions (
+        id INTEGER PRIMARY KEY,
+        transaction_id VARCHAR(100) NOT NULL UNIQUE,
+        customer_id VARCHAR(100) NOT NULL,
+        amount FLOAT,
+        score FLOAT NOT NULL,
+        prediction INTEGER NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        reason VARCHAR(100),
+        created_at DATETIME NOT NULL,
+        processed_at DATETIME NOT NULL
+    )
+"""
+
+def test_upgrade_adds_columns_indexes_and_backfills_event_time(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'scoring.db'}")
+    processed = datetime.utcnow() - timedelta(seconds=10)
+    with engine.begin() as conn:
+        conn.execute(text(PRE_EVENT_TIME_TABLE))
+        conn.execute(text(
+            "INSERT INTO scored_transactions VALUES "
+            "(1, 'TX_OLD', 'CUST_1', 10.0, 0.1, 0, 'APPROVED', 'ML_MODEL', :t, :t)"
+        ), {"t": processed})
+
+    upgrade_schema(engine)
+    upgrade_schema(engine)
+
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("scored_transactions")}
+    indexes = {index["name"] for index in inspector.get_indexes("scored_transactions")}
+    assert {"event_time", "kafka_partition", "consume_lag_ms", "latency_ms"} <= columns
+    assert {"idx_customer_event", "idx_partition_event"} <= indexes
+
+    # Pre-upgrade rows keep counting toward velocity via processed_at
+    monkeypatch.setattr(repository, "SessionLocal", sessionmaker(bind=engine))
+    assert TransactionRepository.count_recent_transactions("CUST_1", seconds=60) == 1
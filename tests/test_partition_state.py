@@ -0,0 +1,92 @@
+import json
+from datetime import datetime, timedelta
+from confluent_kafka import TIMESTAMP_NOT_AVAILABLE
+from app.database.repository import TransactionRepository
+from app.kafka.consumer import KafkaConsumerClient
+from app.kafka.schema import PaymentTransaction
+from app.services.partition_state import PartitionState, PartitionStateStore
+from app.services.scoring_service import ScoringService
+
+def test_partition_state_counts_event_time_window():
+    state = PartitionState(0, retention=timedelta(seconds=20))
+    now = datetime(2024, 1, 1, 12, 0, 0)
+
+    for seconds_ago in (90, 30, 10, 0):
+        state.record("CUST_1", now - timedelta(seconds=seconds_ago))
+    state.record("CUST_1", now - timedelta(seconds=5))  # out of order
+
+    assert state.count("CUST_1", now, 60) == 4
+    assert state.count("CUST_2", now, 60) == 0
+
+    # Pruned relative to the event-time watermark, not the wall clock
+    state.prune()
+    assert state.customers["CUST_1"][0] == now - timedelta(seconds=10)
+
+def test_assign_rebuilds_from_partition_watermark(monkeypatch):
+    # An hour behind the wall clock, as during catch-up
+    latest = datetime.utcnow() - timedelta(hours=1)
+    requested = {}
+
+    def recent_partition_events(partition, since):
+        requested[partition] = since
+        return [("CUST_1", latest - timedelta(seconds=30)), ("CUST_1", latest)]
+
+    monkeypatch.setattr(TransactionRepository, "latest_partition_event_times",
+                        staticmethod(lambda partitions: {3: latest}))
+    monkeypatch.setattr(TransactionRepository, "recent_partition_events",
+                        staticmethod(recent_partition_events))
+
+    store = PartitionStateStore(window_seconds=60, lateness_seconds=5)
+    store.assign([3, 4])
+
+    assert requested == {3: latest - timedelta(seconds=65)}
+    assert store.count_recent(3, "CUST_1", latest) == 2
+    assert store.partitions[4].watermark is None
+
+def test_revoked_partition_state_is_dropped():
+    store = PartitionStateStore(window_seconds=60, lateness_seconds=0)
+    store.partitions[3] = PartitionState(3, store.retention)
+    now = datetime.utcnow()
+    store.record(3, "CUST_1", now)
+
+    assert store.count_recent(3, "CUST_1", now) == 1
+
+    store.revoke([3])
+    assert not store.owns(3)
+
+class FakeMessage:
+    def __init__(self, key, value, partition=3):
+        self._key, self._value, self._partition = key, value, partition
+
+    def key(self):
+        return self._key
+
+    def value(self):
+        return self._value
+
+    def partition(self):
+        return self._partition
+
+    def timestamp(self):
+        return TIMESTAMP_NOT_AVAILABLE, 0
+
+def test_unkeyed_messages_counted_from_mysql(monkeypatch):
+    monkeypatch.setattr(TransactionRepository, "count_recent_transactions",
+                        staticmethod(lambda customer_id, seconds, until: 7))
+
+    consumer = object.__new__(KafkaConsumerClient)
+    payload = json.dumps({"transaction_id": "TX_1", "customer_id": "CUST_1", "amount": 10.0,
+                          "feature_1": 0.1, "feature_2": 0.1, "feature_3": 0.1}).encode()
+    keyed = PaymentTransaction(**consumer._decode(FakeMessage(b"CUST_1", payload)))
+    unkeyed = PaymentTransaction(**consumer._decode(FakeMessage(None, payload)))
+    assert keyed.keyed_by_customer and not unkeyed.keyed_by_customer
+
+    store = PartitionStateStore(window_seconds=60, lateness_seconds=0)
+    store.partitions[3] = PartitionState(3, store.retention)
+    now = datetime.utcnow()
+    store.record(3, "CUST_1", now)
+    service = ScoringService(None, partition_state=store)
+
+    assert service.count_recent(keyed, now) == 1
+    assert service.count_recent(unkeyed, now) == 7
+    assert store.stats()["unkeyed_events"] == 1
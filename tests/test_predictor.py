@@ -1,5 +1,9 @@
+import joblib
 import numpy as np
+from app.config.settings import settings
+from app.model.loader import ModelLoader
 from app.model.predictor import Predictor
+from app.model.score_cache import ScoreCache
 
 class DummyModel:
     def predict_proba(self, X):
@@ -15,3 +19,73 @@ def test_predict():
 
     assert isinstance(score, float)
     assert prediction in [0, 1]
+
+class RowModel:
+    def predict_proba(self, X):
+        return np.column_stack([1 - X[:, 0], X[:, 0]])
+
+def test_predict_batch_split_across_threads_keeps_order():
+    predictor = Predictor(RowModel(), DummyScaler(), threads=4, min_chunk_rows=2)
+    features = np.column_stack([np.linspace(0, 1, 11), np.zeros(11)])
+    scores, predictions = predictor.predict_batch(features)
+    predictor.close()
+
+    assert np.allclose(scores, features[:, 0])
+    assert list(predictions) == [int(s > 0.5) for s in features[:, 0]]
+
+class CountingModel(RowModel):
+    def __init__(self):
+        self.rows = 0
+
+    def predict_proba(self, X):
+        self.rows += len(X)
+        return super().predict_proba(X)
+
+def test_score_cache_hits_and_invalidates_on_reload():
+    model = CountingModel()
+    cache = ScoreCache(max_size=10, decimals=6)
+    predictor = Predictor(model, DummyScaler(), threads=1, cache=cache, model_version="v1")
+
+    predictor.predict_batch([[0.3, 0.1], [0.7, 0.2]])
+    scores, _ = predictor.predict_batch([[0.3, 0.1], [0.9, 0.2]])
+
+    assert np.allclose(scores, [0.3, 0.9])
+    assert model.rows == 3
+    assert cache.stats()["hits"] == 1
+
+    predictor.reload(model, DummyScaler(), model_version="v2")
+    predictor.predict_batch([[0.3, 0.1]])
+    assert model.rows == 4
+
+def test_score_cache_keys_distinct_for_large_features():
+    model = CountingModel()
+    cache = ScoreCache(max_size=10, decimals=6)
+    predictor = Predictor(model, DummyScaler(), threads=1, cache=cache, model_version="v1")
+
+    # Beyond int64 once scaled by 10**6, these used to collide
+    first, _ = predictor.predict_batch([[1e13, 0.1, 0.1]])
+    second, _ = predictor.predict_batch([[9e13, 0.1, 0.1]])
+
+    assert first[0] == 1e13 and second[0] == 9e13
+    assert model.rows == 2
+    # Still rounds to the configured decimals
+    keys = cache.keys_for(np.array([[0.1234561], [0.1234559], [0.1234571]]))
+    assert keys[0] == keys[1] != keys[2]
+
+def test_model_version_tracks_loaded_artifacts_not_disk(tmp_path, monkeypatch):
+    model_path, scaler_path = tmp_path / "model.pkl", tmp_path / "scaler.pkl"
+    joblib.dump({"trees": 1}, model_path)
+    joblib.dump({"mean": 0}, scaler_path)
+    monkeypatch.setattr(settings, "MODEL_PATH", str(model_path))
+    monkeypatch.setattr(settings, "SCALER_PATH", str(scaler_path))
+
+    ModelLoader.load_model()
+    ModelLoader.load_scaler()
+    version = ModelLoader.model_version()
+
+    # Artifact replaced on disk after loading: version still describes memory
+    joblib.dump({"trees": 2}, model_path)
+    assert ModelLoader.model_version() == version
+
+    ModelLoader.load_model()
+    assert ModelLoader.model_version() != version
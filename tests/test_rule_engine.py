@@ -0,0 +1,80 @@
+import json
+import os
+import numpy as np
+from app.rules.engine import RuleEngine
+
+RULES = {
+    "thresholds": {"DECLINED": 0.85, "REVIEW": 0.65},
+    "rules": [
+        {
+            "name": "velocity",
+            "reason": "VELOCITY_RULE",
+            "priority": 10,
+            "when": [{"field": "recent_count", "op": ">=", "value": 12}],
+            "action": "boost",
+            "boost": 0.15,
+            "cap": 0.99
+        },
+        {
+            "name": "blocklist",
+            "reason": "BLOCKLIST",
+            "priority": 100,
+            "when": [{"field": "customer_id", "op": "in", "value": ["CUST_BAD"]}],
+            "action": "override",
+            "status": "DECLINED"
+        }
+    ]
+}
+
+
+def make_engine(tmp_path, rules=RULES):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(rules))
+    return RuleEngine(path=str(path), reload_interval=0)
+
+
+def write_rules(path, rules):
+    # Bump the mtime explicitly, a rewrite can land in the same mtime tick
+    mtime = os.path.getmtime(path) + 10
+    path.write_text(json.dumps(rules))
+    os.utime(path, (mtime, mtime))
+
+
+def test_rules_boost_override_and_reason_precedence(tmp_path):
+    engine = make_engine(tmp_path)
+
+    scores, statuses, reasons = engine.evaluate({
+        "score": np.array([0.1, 0.6, 0.9, 0.1]),
+        "recent_count": np.array([0, 20, 20, 20]),
+        "customer_id": np.array(["CUST_1", "CUST_2", "CUST_3", "CUST_BAD"], dtype=object),
+    })
+
+    assert np.allclose(scores, [0.1, 0.75, 0.99, 0.25])
+    assert list(statuses) == ["APPROVED", "REVIEW", "DECLINED", "DECLINED"]
+    assert list(reasons) == ["ML_MODEL", "VELOCITY_RULE", "VELOCITY_RULE", "BLOCKLIST"]
+    assert engine.stats() == {"velocity": 3, "blocklist": 1}
+
+
+def test_rules_hot_reload(tmp_path):
+    engine = make_engine(tmp_path)
+    assert engine.status_for(0.7) == "REVIEW"
+
+    write_rules(tmp_path / "rules.json", {"thresholds": {"REVIEW": 0.75}})
+    engine.maybe_reload()
+
+    assert engine.status_for(0.7) == "APPROVED"
+
+
+def test_invalid_rules_rejected_and_previous_rules_kept(tmp_path):
+    engine = make_engine(tmp_path)
+
+    for bad_rule in (
+        {"name": "merchant", "when": [{"field": "merchant_id", "op": "==", "value": "M1"}]},
+        {"name": "blocklist", "when": [{"field": "customer_id", "op": "in", "value": 5}]},
+        {"name": "amount", "when": [{"field": "amount", "op": ">=", "value": "1000"}]},
+    ):
+        write_rules(tmp_path / "rules.json", {"rules": [bad_rule]})
+        engine.maybe_reload()
+
+        assert set(engine.stats()) == {"velocity", "blocklist"}
+        assert [rule.name for rule in engine._ruleset.rules] == ["velocity", "blocklist"]
@@ -0,0 +1,87 @@
+from datetime import datetime
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.database import repository
+from app.database.models import Base, ScoredTransaction
+from app.database.repository import TransactionRepository
+from app.main import process_messages
+from app.services.scoring_service import ScoringService
+
+class BatchPredictor:
+    def predict_batch(self, features):
+        scores = np.full(len(features), 0.1)
+        return scores, (scores > 0.5).astype(int)
+
+class DlqConsumer:
+    def __init__(self):
+        self.dlq = []
+
+    def send_to_dlq(self, message):
+        self.dlq.append(message)
+
+def make_messages(ids):
+    return [
+        {"transaction_id": f"TX_{i}", "customer_id": "CUST_1", "amount": 10.0,
+         "feature_1": 0.1, "feature_2": 0.1, "feature_3": 0.1}
+        for i in ids
+    ]
+
+def test_process_batch_counts_earlier_batch_rows_toward_velocity(monkeypatch):
+    saved = []
+    monkeypatch.setattr(TransactionRepository, "count_recent_transactions",
+                        staticmethod(lambda customer_id, seconds, until: 11))
+    monkeypatch.setattr(TransactionRepository, "save_many", staticmethod(saved.extend))
+
+    now = datetime.utcnow().timestamp()
+    messages = [
+        {"transaction_id": f"TX_{i}", "customer_id": "CUST_1", "amount": 10.0,
+         "feature_1": 0.1, "feature_2": 0.1, "feature_3": 0.1, "event_time": now + i}
+        for i in range(2)
+    ]
+    ScoringService(BatchPredictor()).process_batch(messages)
+
+    assert [row["reason"] for row in saved] == ["ML_MODEL", "VELOCITY_RULE"]
+
+def test_failed_flush_then_per_message_retry_saves_each_row_once(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'scoring.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    # The first commit loses the connection, later ones succeed
+    failures = [OperationalError("INSERT", {}, Exception("connection lost"))]
+
+    def flaky_session():
+        session = Session()
+        commit = session.commit
+
+        def flaky_commit():
+            if failures:
+                raise failures.pop()
+            commit()
+
+        session.commit = flaky_commit
+        return session
+
+    monkeypatch.setattr(repository, "SessionLocal", flaky_session)
+    monkeypatch.setattr(repository, "BATCH_SIZE", 2)
+    monkeypatch.setattr(TransactionRepository, "_buffer", [])
+
+    service = ScoringService(BatchPredictor())
+    consumer = DlqConsumer()
+
+    process_messages(service, consumer, make_messages(range(3)))
+    assert not failures
+    assert [row["transaction_id"] for row in TransactionRepository._buffer] == ["TX_0", "TX_1", "TX_2"]
+
+    process_messages(service, consumer, make_messages(range(3, 7)))
+    TransactionRepository.flush()
+
+    session = Session()
+    stored = sorted(row[0] for row in session.query(ScoredTransaction.transaction_id))
+    session.close()
+
+    assert stored == [f"TX_{i}" for i in range(7)]
+    assert TransactionRepository._buffer == []
+    assert consumer.dlq == []
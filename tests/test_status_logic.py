@@ -6,6 +6,6 @@ class DummyPredictor:
 
 def test_status_declined():
     service = ScoringService(DummyPredictor())
-    status = service.determine_status(0.95, 1)
+    status = service.determine_status(0.95)
 
     assert status == "DECLINED"